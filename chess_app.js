@@ -12,6 +12,7 @@ let playerColor = 'white'; // Player's color
 let difficulty = 3;      // Difficulty level (1-4)
 let boardOrientation = 'white'; // Board orientation
 let currentHint = null;  // Current hint move
+const EVAL_REFRESH_MS = 1500; // Delay before fetching the deepened evaluation
 let moveSound = new Audio('https://assets.mixkit.co/active_storage/sfx/201/201.wav');
 let captureSound = new Audio('https://assets.mixkit.co/active_storage/sfx/3197/3197.wav');
 
@@ -296,11 +297,16 @@ function highlightLastMove(from, to) {
  * Handle piece drop
  */
 function onDrop(source, target) {
+    // Let the player pick the piece when a pawn promotes
+    const isPromotion = game.moves({ square: source, verbose: true })
+        .some(m => m.to === target && m.flags.indexOf('p') !== -1);
+    const promotion = isPromotion ? choosePromotion() : undefined;
+    
     // See if the move is legal
     const move = game.move({
         from: source,
         to: target,
-        promotion: 'q' // Always promote to queen for simplicity
+        promotion: promotion
     });
     
     // If illegal move, return piece to source square
@@ -313,13 +319,22 @@ function onDrop(source, target) {
         moveSound.play();
     }
     
-    // Make the move on the server
-    makeMove(source, target);
+    // Make the move on the server (UCI, e.g. e2e4 or e7e8q)
+    makeMove(move.from + move.to + (move.promotion || ''));
     
     // Highlight the move
     highlightLastMove(source, target);
 }
 
+/**
+ * Ask which piece a promoting pawn becomes; defaults to a queen
+ */
+function choosePromotion() {
+    const answer = window.prompt('Promote to: q (queen), r (rook), b (bishop) or n (knight)', 'q');
+    const piece = (answer || 'q').trim().toLowerCase().charAt(0);
+    return piece && 'qrbn'.indexOf(piece) !== -1 ? piece : 'q';
+}
+
 /**
  * Called after piece snap animation completes
  */
@@ -331,7 +346,7 @@ function onSnapEnd() {
 /**
  * Make a move on the server
  */
-function makeMove(from, to) {
+function makeMove(uci) {
     if (!gameId) return;
     
     fetch('/api/move', {
@@ -341,8 +356,7 @@ function makeMove(from, to) {
         },
         body: JSON.stringify({
             gameId: gameId,
-            from: from,
-            to: to
+            uci: uci
         })
     })
     .then(response => response.json())
@@ -355,32 +369,34 @@ function makeMove(from, to) {
             updateMoveHistory(data.moveHistory);
         }
         
-        // Update evaluation
+        // Update evaluation; the server keeps deepening it in the background
         if (data.evaluation) {
             updateEvaluation(data.evaluation);
         }
+        setTimeout(refreshEvaluation, EVAL_REFRESH_MS);
         
         // In Play mode, handle engine's move if available
         if (gameMode === 'Play' && data.engineMove) {
-            // Update chess.js game
-            game.move({
-                from: data.engineMove.from,
-                to: data.engineMove.to,
-                promotion: 'q'
+            // Update chess.js game from the engine's UCI move
+            const uci = data.engineMove.uci;
+            const engineMove = game.move({
+                from: uci.slice(0, 2),
+                to: uci.slice(2, 4),
+                promotion: uci.charAt(4) || undefined
             });
             
             // Update board
             board.position(game.fen());
             
             // Play move sound
-            if (data.engineMove.captured) {
+            if (engineMove && engineMove.captured) {
                 captureSound.play();
             } else {
                 moveSound.play();
             }
             
             // Highlight the move
-            highlightLastMove(data.engineMove.from, data.engineMove.to);
+            highlightLastMove(engineMove.from, engineMove.to);
             
             // Show move analysis
             document.getElementById('moveAnalysis').textContent = 
@@ -444,6 +460,32 @@ function updateMoveHistory(moveHistory) {
     historyElement.scrollTop = historyElement.scrollHeight;
 }
 
+/**
+ * Fetch the latest evaluation of the current position from the server
+ */
+function refreshEvaluation() {
+    if (!gameId) return;
+    
+    fetch('/api/analyze', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+            gameId: gameId
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.evaluation) {
+            updateEvaluation(data.evaluation);
+        }
+    })
+    .catch(error => {
+        console.error('Error fetching evaluation:', error);
+    });
+}
+
 /**
  * Update the position evaluation display
  */
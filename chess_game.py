@@ -1,9 +1,100 @@
 import chess
 import chess.engine
+import chess.polyglot
+import os
+import queue
 import random
 import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, List, Dict, Any, Tuple
 
+try:
+    import psutil
+except ImportError:
+    # psutil is optional; it is only used to size the engine hash table
+    psutil = None
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional; without it the move classifier runs as plain Python
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+# Upper bound on cached engine moves; Self-Practice can visit many positions
+MOVE_CACHE_SIZE = 4096
+
+# A search may stop early once it reaches this depth with a settled score
+STABLE_DEPTH = 12
+STABLE_WINDOW = 3       # consecutive iterations compared
+STABLE_MARGIN_CP = 20   # maximum score swing across the window
+
+# Squares and piece types used to classify moves in coach comments
+_CENTER_BB = chess.BB_E4 | chess.BB_D4 | chess.BB_E5 | chess.BB_D5
+_MINORS_MASK = (1 << chess.KNIGHT) | (1 << chess.BISHOP)
+
+# Coach comment tags returned by _classify_move, one bit each
+_TAG_CAPTURE = 1
+_TAG_CHECK = 2
+_TAG_CENTER = 4
+_TAG_DEVELOPMENT = 8
+_TAG_CASTLING = 16
+
+# Comment for each tag bit, in bit order
+_TAG_COMMENTS = (
+    "Good! Capturing pieces can help gain material advantage.",
+    "Nice check! Putting pressure on the opponent's king.",
+    "Good move! Controlling the center is important in chess.",
+    "Good development! Getting your pieces into the game early is important.",
+    "Good castling! This move protects your king and connects your rooks.",
+)
+
+# Full coach comment for every combination of tags, indexed by the bitmask
+_COMMENTS = tuple(
+    " ".join(text for bit, text in enumerate(_TAG_COMMENTS) if tags >> bit & 1)
+    or "Remember to develop your pieces and control the center."
+    for tags in range(1 << len(_TAG_COMMENTS))
+)
+
+@njit(cache=True)
+def _classify_move(to_square, piece_type, is_capture, gives_check, is_castling, fullmove_number):
+    """Classify a move for coach comments.
+    
+    Integer-only so numba can compile it; piece_type is 0 for an empty square.
+    
+    Returns:
+        A bitmask of _TAG_* flags
+    """
+    # Straight-line bit arithmetic; no data-dependent branches
+    is_center = (_CENTER_BB >> to_square) & 1
+    is_development = (_MINORS_MASK >> piece_type) & int(fullmove_number <= 10)
+    return (int(is_capture) * _TAG_CAPTURE
+            | int(gives_check) * _TAG_CHECK
+            | is_center * _TAG_CENTER
+            | is_development * _TAG_DEVELOPMENT
+            | int(is_castling) * _TAG_CASTLING)
+
+def _host_engine_options() -> Dict[str, int]:
+    """Engine options sized for the machine we are running on.
+    
+    Uses all but one core for search threads and an eighth of the
+    available memory (64 MB to 4 GB) for the hash table.
+    
+    Returns:
+        UCI option values keyed by option name
+    """
+    threads = max(1, (os.cpu_count() or 1) - 1)
+    hash_mb = 128
+    if psutil is not None:
+        available_mb = psutil.virtual_memory().available // (1024 * 1024)
+        hash_mb = min(max(available_mb // 8, 64), 4096)
+    return {"Skill Level": 20, "Threads": threads, "Hash": hash_mb}
+
 class StockfishError(Exception):
     """Exception raised for errors related to the Stockfish engine."""
     pass
@@ -11,36 +102,75 @@ class StockfishError(Exception):
 class ChessGame:
     """Chess game implementation with AI integration."""
     
-    def __init__(self, engine_path: str, mode: str):
+    __slots__ = (
+        "board", "mode", "engine", "_engine_path", "_engine_pool",
+        "difficulty_level", "show_hints", "current_evaluation", "last_move",
+        "_move_cache", "move_history", "_san_history", "_legal_cache",
+        "_engine_lock", "_executor", "_analysis", "_analysis_key",
+        "_analysis_started", "_eval_min_interval", "_last_eval_ts",
+        "_last_eval_key", "_last_eval_result", "_book_path", "_book",
+        "_book_entries", "_skill_level",
+    )
+    
+    def __init__(self, engine_path: str, mode: str, book_path: Optional[str] = None):
         """Initialize a new chess game.
         
         Args:
             engine_path: Path to the chess engine executable
             mode: Game mode ('Play', 'Practice', or 'Self-Practice')
+            book_path: Optional Polyglot book consulted before the engine;
+                engine moves found this session are added to it on close()
         """
         self.board = chess.Board()
         self.mode = mode
         self.engine = None
+        self._engine_path = engine_path
+        self._engine_pool = None  # Extra engines for analyze_batch, started lazily
         self.difficulty_level = 3
         self.show_hints = True
         self.current_evaluation = "0.0"
         self.last_move = None
-        self._move_cache = {}  # Cache for analyzed positions
-        self.move_history = []
+        # Caches below are keyed by board._transposition_key(), as in main.py:
+        # the position's bitboards, cheaper than fen() or a Zobrist hash
+        self._move_cache = OrderedDict()  # Position key -> move, oldest first
+        self.move_history = []  # chess.Move objects; see get_san_history()
+        self._san_history = []  # SAN for a prefix of move_history
+        self._legal_cache = (None, ())  # (Position key, legal moves)
+        self._engine_lock = threading.Lock()
+        # Single worker so background searches never overlap on the engine
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._skill_level = 20  # As configured on the engine; see set_difficulty()
+        # Long-lived search shared by move selection and evaluation
+        self._analysis = None
+        self._analysis_key = None
+        self._analysis_started = 0.0
+        # Evaluation rate limit; see _analyze()
+        self._eval_min_interval = 0.5
+        self._last_eval_ts = 0.0
+        self._last_eval_key = None
+        self._last_eval_result = "0.0"
+        # Opening book shared across sessions; see _save_book(). Only
+        # full-strength (Skill Level 20) engine moves are added to it, and
+        # it is only consulted at that level
+        self._book_path = book_path
+        self._book = None
+        self._book_entries = {}  # Zobrist hash -> Polyglot move, new this session
+        if book_path and os.path.exists(book_path):
+            try:
+                self._book = chess.polyglot.open_reader(book_path)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not open opening book {book_path}: {e}")
         
         try:
             self.engine = chess.engine.SimpleEngine.popen_uci(engine_path)
             
-            # Configure engine with optimal settings
-            try:
-                self.engine.configure({
-                    "Skill Level": 20,
-                    "Threads": 2,  # Adjust based on CPU
-                    "Hash": 128,   # Memory in MB
-                })
-            except chess.engine.EngineError:
-                # Some engines don't support these options
-                logging.warning("Engine doesn't support all configuration options")
+            # Configure engine for this host, one option at a time so an
+            # engine lacking one option still gets the others
+            for name, value in _host_engine_options().items():
+                try:
+                    self.engine.configure({name: value})
+                except chess.engine.EngineError:
+                    logging.warning(f"Engine doesn't support the {name} option")
         except Exception as e:
             logging.error(f"Failed to start chess engine: {e}")
             # We'll continue without an engine and use fallback random moves
@@ -48,31 +178,82 @@ class ChessGame:
     def get_engine_move(self) -> Optional[chess.Move]:
         """Get the best move from the chess engine.
         
+        Blocks the caller for the whole search; interactive callers should
+        prefer submit_engine_move().
+        
         Returns:
             A chess move object or None if no move could be determined
         """
-        if self.board.is_game_over():
+        return self._search_move(self.board)
+    
+    # Practice-mode suggestions are plain engine moves; alias to skip a frame
+    get_practice_move = get_engine_move
+    
+    def submit_engine_move(self) -> "Future[Optional[chess.Move]]":
+        """Start an engine search for the current position in the background.
+        
+        The board is copied before submission so the caller may keep
+        mutating self.board while the engine thinks.
+        
+        Returns:
+            A future resolving to the engine move (see poll_engine_move)
+        """
+        return self._executor.submit(self._search_move, self.board.copy())
+    
+    def poll_engine_move(self, future: "Future[Any]") -> Tuple[bool, Any]:
+        """Check background engine work without blocking.
+        
+        Works for the future of any submit_* method (engine move, top-k
+        moves, analysis).
+        
+        Args:
+            future: The future returned by a submit_* method
+            
+        Returns:
+            A (done, result) tuple; result is only meaningful once done is True
+        """
+        if not future.done():
+            return False, None
+        return True, future.result()
+    
+    def _search_move(self, board: chess.Board) -> Optional[chess.Move]:
+        """Search for the best move in the given position.
+        
+        Args:
+            board: The position to search; never mutated
+            
+        Returns:
+            A chess move object or None if no move could be determined
+        """
+        if board.is_game_over():
             return None
             
         try:
-            board_fen = self.board.fen()
-            if board_fen in self._move_cache:
-                return self._move_cache[board_fen]
+            key = board._transposition_key()
+            if key in self._move_cache:
+                return self._move_cache[key]
+            
+            # Book moves are full strength; weaker levels must search instead
+            if self._book and self._skill_level == 20:
+                entry = self._book.get(board)
+                if entry:
+                    return entry.move
             
             if not self.engine:
-                return self.get_random_move()
+                return self._random_move(board)
                 
-            result = self.engine.play(
-                self.board,
-                chess.engine.Limit(time=1.0),  # Increased from 0.5s
-                info=chess.engine.INFO_ALL
-            )
-            
-            if result is not None:
-                move = result.move
+            with self._engine_lock:
+                move = self._wait_for_stable_move(self._position_analysis(board))
+                skill_level = self._skill_level
+            
+            if move is not None:
                 # Verify the move is legal before caching
-                if move in self.board.legal_moves:
-                    self._move_cache[board_fen] = move
+                if move in board.legal_moves:
+                    self._move_cache[key] = move
+                    if len(self._move_cache) > MOVE_CACHE_SIZE:
+                        self._move_cache.popitem(last=False)
+                    if self._book_path and skill_level == 20:
+                        self._book_entries[chess.polyglot.zobrist_hash(board)] = self._polyglot_move(board, move)
                     return move
                 else:
                     raise StockfishError(f"Illegal move suggested: {move}")
@@ -82,7 +263,50 @@ class ChessGame:
         except (chess.engine.EngineTerminatedError, StockfishError) as e:
             logging.error(f"Engine error: {e}")
             # Fallback: Random legal move
-            return self.get_random_move()
+            return self._random_move(board)
+    
+    @staticmethod
+    def _polyglot_move(board: chess.Board, move: chess.Move) -> int:
+        """Encode a move in Polyglot book format.
+        
+        Args:
+            board: The position the move is played in
+            move: The move to encode
+            
+        Returns:
+            The 16-bit Polyglot move
+        """
+        to_square = move.to_square
+        if board.is_castling(move):
+            # Polyglot stores castling as the king capturing its own rook
+            rook_file = 7 if board.is_kingside_castling(move) else 0
+            to_square = chess.square(rook_file, chess.square_rank(move.from_square))
+        promotion = move.promotion - 1 if move.promotion else 0
+        return to_square | move.from_square << 6 | promotion << 12
+    
+    def _save_book(self) -> None:
+        """Merge this session's engine moves into the opening book file."""
+        if not self._book_path or not self._book_entries:
+            return
+        
+        entries = {}
+        if self._book:
+            for entry in self._book:
+                entries[(entry.key, entry.raw_move)] = (entry.weight, entry.learn)
+            self._book.close()
+            self._book = None
+        for key, raw_move in self._book_entries.items():
+            entries.setdefault((key, raw_move), (1, 0))
+        
+        # Readers binary-search the file, so entries must be sorted by key
+        tmp_path = self._book_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                for (key, raw_move), (weight, learn) in sorted(entries.items()):
+                    f.write(chess.polyglot.ENTRY_STRUCT.pack(key, raw_move, weight, learn))
+            os.replace(tmp_path, self._book_path)
+        except OSError as e:
+            logging.error(f"Failed to save opening book: {e}")
     
     def get_random_move(self) -> Optional[chess.Move]:
         """Generate a random legal move.
@@ -90,20 +314,181 @@ class ChessGame:
         Returns:
             A random legal chess move or None if no moves are available
         """
-        legal_moves = list(self.board.legal_moves)
-        return random.choice(legal_moves) if legal_moves else None
+        return self._random_move(self.board)
+    
+    def _random_move(self, board: chess.Board) -> Optional[chess.Move]:
+        """Pick a random legal move in the given position."""
+        key = board._transposition_key()
+        cached_key, moves = self._legal_cache
+        if cached_key != key:
+            # One generation pass; counting first and then walking to an
+            # index generates the moves twice and is measurably slower
+            moves = tuple(board.generate_legal_moves())
+            self._legal_cache = (key, moves)
+        if not moves:
+            return None
+        return random.choice(moves)
+    
+    def get_top_k_moves(self, k: int = 3) -> List[chess.Move]:
+        """Get the engine's k best moves from a single MultiPV search.
+        
+        Args:
+            k: Number of candidate moves to return
+            
+        Returns:
+            Up to k moves, best first; empty if the game is over
+        """
+        return self._top_k_moves(self.board, k)
+    
+    def submit_top_k_moves(self, k: int = 3) -> "Future[List[chess.Move]]":
+        """Start get_top_k_moves for the current position in the background.
+        
+        Args:
+            k: Number of candidate moves to return
+            
+        Returns:
+            A future resolving to up to k moves, best first
+        """
+        return self._executor.submit(self._top_k_moves, self.board.copy(), k)
     
-    def get_practice_move(self) -> Optional[chess.Move]:
-        """Get a move suggestion for practice mode.
+    def _top_k_moves(self, board: chess.Board, k: int) -> List[chess.Move]:
+        """Rank the k best moves in the given position.
         
+        Args:
+            board: The position to search; never mutated
+            k: Number of candidate moves to return
+            
         Returns:
-            A suggested chess move for the current position
+            Up to k moves, best first
         """
-        return self.get_engine_move()
+        if board.is_game_over():
+            return []
+        
+        if not self.engine:
+            fallback = self._random_move(board)
+            return [fallback] if fallback else []
+        
+        try:
+            with self._engine_lock:
+                # The engine runs one search at a time; drop the single-PV one
+                self._stop_analysis()
+                infos = self.engine.analyse(board, chess.engine.Limit(time=1.0), multipv=k,
+                                            info=chess.engine.INFO_PV)
+            return [info["pv"][0] for info in infos if info.get("pv")]
+        except (chess.engine.EngineTerminatedError, chess.engine.EngineError) as e:
+            logging.error(f"Engine error: {e}")
+            fallback = self._random_move(board)
+            return [fallback] if fallback else []
+    
+    def analyze_batch(self, boards: List[chess.Board]) -> List[Optional[chess.Move]]:
+        """Find engine moves for many positions in parallel.
+        
+        Positions are spread over a pool of single-threaded engine
+        processes, one per CPU core, so batch self-play scales with the
+        number of cores. The pool is started on first use.
+        
+        Args:
+            boards: The positions to search; never mutated
+            
+        Returns:
+            One move per board, in order; None where the game is over
+        """
+        pool = self._get_engine_pool()
+        if not pool:
+            return [self._random_move(board) for board in boards]
+        
+        idle_engines = queue.Queue()
+        for engine in pool:
+            idle_engines.put(engine)
+        
+        def search(board: chess.Board) -> Optional[chess.Move]:
+            if board.is_game_over():
+                return None
+            engine = idle_engines.get()
+            try:
+                return engine.play(board, chess.engine.Limit(time=1.0),
+                                   info=chess.engine.INFO_NONE).move
+            except (chess.engine.EngineTerminatedError, chess.engine.EngineError) as e:
+                logging.error(f"Engine error: {e}")
+                return self._random_move(board)
+            finally:
+                idle_engines.put(engine)
+        
+        with ThreadPoolExecutor(max_workers=len(pool)) as executor:
+            return list(executor.map(search, boards))
+    
+    def _get_engine_pool(self) -> List[chess.engine.SimpleEngine]:
+        """Start the analyze_batch engine pool if it isn't running yet.
+        
+        Returns:
+            The pooled engines; empty if none could be started
+        """
+        if self._engine_pool is None:
+            self._engine_pool = []
+            for _ in range(os.cpu_count() or 1):
+                try:
+                    engine = chess.engine.SimpleEngine.popen_uci(self._engine_path)
+                except Exception as e:
+                    logging.error(f"Failed to start pool engine: {e}")
+                    break
+                try:
+                    # Parallelism comes from the pool, not from engine threads
+                    engine.configure({"Threads": 1})
+                except chess.engine.EngineError:
+                    logging.warning("Engine doesn't support thread configuration")
+                self._engine_pool.append(engine)
+        return self._engine_pool
     
     def analyze_position(self) -> str:
         """Analyze the current position and return evaluation.
         
+        Returns:
+            A string representing the position evaluation
+        """
+        return self._analyze(self.board)
+    
+    def submit_analysis(self) -> "Future[str]":
+        """Start evaluating the current position in the background.
+        
+        Returns:
+            A future resolving to the same string analyze_position returns
+        """
+        return self._executor.submit(self._analyze, self.board.copy())
+    
+    def _analyze(self, board: chess.Board) -> str:
+        """Evaluate the given position, reusing the last result for it.
+        
+        The engine is skipped when the position was the last one evaluated.
+        A new position evaluated within _eval_min_interval of the previous
+        evaluation is deferred until the interval has passed, never answered
+        with another position's result.
+        
+        Args:
+            board: The position to evaluate; never mutated
+            
+        Returns:
+            A string representing the position evaluation
+        """
+        key = board._transposition_key()
+        if key == self._last_eval_key:
+            return self._last_eval_result
+        
+        wait = self._last_eval_ts + self._eval_min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        
+        result = self._evaluate(board)
+        self._last_eval_key = key
+        self._last_eval_ts = time.monotonic()
+        self._last_eval_result = result
+        return result
+    
+    def _evaluate(self, board: chess.Board) -> str:
+        """Evaluate the given position with the engine.
+        
+        Args:
+            board: The position to evaluate; never mutated
+            
         Returns:
             A string representing the position evaluation
         """
@@ -111,14 +496,24 @@ class ChessGame:
             if not self.engine:
                 return "0.0"
                 
-            # Increase analysis time for more stable results
-            info = self.engine.analyse(self.board, chess.engine.Limit(time=0.2))
+            # Read the score from the shared search once it has run 0.2s
+            with self._engine_lock:
+                analysis = self._position_analysis(board)
+                deadline = self._analysis_started + 0.2
+                while time.monotonic() < deadline:
+                    try:
+                        analysis.get()
+                    except chess.engine.AnalysisComplete:
+                        break
+                info = analysis.info
             score = info.get("score", None)
             
             if score:
                 if score.is_mate():
-                    self.current_evaluation = f"Mate in {abs(score.mate())}"
-                    return f"Mate in {abs(score.mate())}"
+                    # PovScore has no mate(); take it from one side's view
+                    mate = abs(score.white().mate())
+                    self.current_evaluation = f"Mate in {mate}"
+                    return f"Mate in {mate}"
                 else:
                     try:
                         cp = score.relative.score() / 100.0 if hasattr(score, "relative") else score.white().score() / 100.0
@@ -132,6 +527,72 @@ class ChessGame:
             logging.error(f"Analysis error: {e}")
             return "0.0"
     
+    def _position_analysis(self, board: chess.Board) -> chess.engine.SimpleAnalysisResult:
+        """Return the running analysis for board, starting one if needed.
+        
+        The search keeps running between calls, so an evaluation followed
+        by a move request for the same position share one search instead
+        of starting two. Must be called with the engine lock held.
+        
+        Args:
+            board: The position to analyze
+            
+        Returns:
+            The analysis handle for the position
+        """
+        key = board._transposition_key()
+        if self._analysis is None or self._analysis_key != key:
+            self._stop_analysis()
+            # Scores drive evaluation and early stopping; the move comes from
+            # bestmove (see _wait_for_stable_move), so PV lines are not parsed
+            self._analysis = self.engine.analysis(board, chess.engine.Limit(time=1.0),
+                                                  info=chess.engine.INFO_SCORE)
+            self._analysis_key = key
+            self._analysis_started = time.monotonic()
+        return self._analysis
+    
+    def _wait_for_stable_move(self, analysis: chess.engine.SimpleAnalysisResult) -> Optional[chess.Move]:
+        """Follow a running analysis until its best move has settled.
+        
+        Easy positions (recaptures, forced replies) settle long before the
+        time limit, so the search result is taken as soon as it reaches
+        STABLE_DEPTH with the score moving less than STABLE_MARGIN_CP over
+        the last STABLE_WINDOW iterations; the search is then stopped and
+        its bestmove returned. Otherwise waits for bestmove. Either way the
+        move comes from bestmove, never the PV, because engines apply a
+        reduced Skill Level only when choosing bestmove.
+        
+        Args:
+            analysis: The analysis to follow
+            
+        Returns:
+            The best move, or None if the engine found none
+        """
+        scores = []
+        for info in analysis:
+            depth = info.get("depth")
+            score = info.get("score")
+            # Aspiration-window bounds are not settled scores
+            if depth is None or score is None or info.get("lowerbound") or info.get("upperbound"):
+                continue
+            scores.append(score.relative.score(mate_score=100000))
+            window = scores[-STABLE_WINDOW:]
+            if (depth >= STABLE_DEPTH and len(window) == STABLE_WINDOW
+                    and max(window) - min(window) < STABLE_MARGIN_CP):
+                analysis.stop()
+                break
+        return analysis.wait().move
+    
+    def _stop_analysis(self) -> None:
+        """Stop and forget the running analysis, if any."""
+        if self._analysis is not None:
+            try:
+                self._analysis.stop()
+            except chess.engine.EngineTerminatedError:
+                pass
+            self._analysis = None
+            self._analysis_key = None
+    
     def get_coach_comment(self, move: chess.Move) -> str:
         """Provide a coaching comment on the move.
         
@@ -141,41 +602,24 @@ class ChessGame:
         Returns:
             A string with coaching advice
         """
-        comments = []
-        
-        # Check for captures
-        if self.board.is_capture(move):
-            comments.append("Good! Capturing pieces can help gain material advantage.")
-        
-        # Check for checks
-        board_copy = self.board.copy()
-        board_copy.push(move)
-        if board_copy.is_check():
-            comments.append("Nice check! Putting pressure on the opponent's king.")
-        
-        # Check for center control
-        center_squares = [chess.E4, chess.D4, chess.E5, chess.D5]
-        if move.to_square in center_squares:
-            comments.append("Good move! Controlling the center is important in chess.")
-        
-        # Check for development in the opening
-        piece = self.board.piece_at(move.from_square)
-        if piece and piece.piece_type in [chess.KNIGHT, chess.BISHOP] and self.board.fullmove_number <= 10:
-            comments.append("Good development! Getting your pieces into the game early is important.")
-        
-        # Check for castling
-        if piece and piece.piece_type == chess.KING and abs(move.from_square - move.to_square) == 2:
-            comments.append("Good castling! This move protects your king and connects your rooks.")
-        
-        # Default comment if none of the above apply
-        if not comments:
-            comments.append("Remember to develop your pieces and control the center.")
-        
-        return " ".join(comments)
+        board = self.board
+        tags = _classify_move(
+            move.to_square,
+            board.piece_type_at(move.from_square) or 0,
+            board.is_capture(move),
+            board.gives_check(move),
+            board.is_castling(move),
+            board.fullmove_number,
+        )
+        return _COMMENTS[tags]
     
     def set_difficulty(self, level: int) -> None:
         """Set the difficulty level for the AI.
         
+        The engine is reconfigured on the background worker, after any
+        search already queued there, so the caller (the GUI thread) never
+        waits for a running search to release the engine.
+        
         Args:
             level: Difficulty level (1-4)
         """
@@ -189,9 +633,22 @@ class ChessGame:
             3: 10,  # Advanced
             4: 20   # Expert
         }.get(level, 10)
+        self._executor.submit(self._configure_skill, skill_level)
+    
+    def _configure_skill(self, skill_level: int) -> None:
+        """Apply a Skill Level to the engine; runs on the background worker.
         
+        Args:
+            skill_level: UCI Skill Level (0-20)
+        """
         try:
-            self.engine.configure({"Skill Level": skill_level})
+            with self._engine_lock:
+                # The running search was started with the old skill level
+                self._stop_analysis()
+                self.engine.configure({"Skill Level": skill_level})
+                self._skill_level = skill_level
+                # Cached moves were chosen at the old strength
+                self._move_cache.clear()
         except chess.engine.EngineError:
             # Some engines don't support this option
             logging.warning("Engine doesn't support skill level configuration")
@@ -206,10 +663,10 @@ class ChessGame:
             True if the move was successfully made, False otherwise
         """
         if move in self.board.legal_moves:
-            san_move = self.board.san(move)
             self.board.push(move)
+            self._legal_cache = (None, ())
             self.last_move = move
-            self.move_history.append(san_move)
+            self.move_history.append(move)
             return True
         return False
     
@@ -221,32 +678,70 @@ class ChessGame:
         """
         if self.board.move_stack:
             self.board.pop()
+            self._legal_cache = (None, ())
             if self.move_history:
                 self.move_history.pop()
+                del self._san_history[len(self.move_history):]
             return True
         return False
     
+    def get_san_history(self) -> List[str]:
+        """Get the move history in standard algebraic notation.
+        
+        SAN needs move generation, so it is only computed here, when the
+        history is actually displayed, and cached for later calls.
+        
+        Returns:
+            The SAN string of every move played so far
+        """
+        pending = len(self.move_history) - len(self._san_history)
+        if pending > 0:
+            # Rewind a shallow copy to the first move without SAN
+            board = self.board.copy(stack=pending)
+            for _ in range(pending):
+                board.pop()
+            for move in self.move_history[-pending:]:
+                self._san_history.append(board.san(move))
+                board.push(move)
+        return self._san_history
+    
     def get_game_state(self) -> Dict[str, Any]:
         """Get the current state of the game.
         
         Returns:
             A dictionary with the current game state
         """
+        # One outcome() call covers all terminal conditions
+        outcome = self.board.outcome()
+        termination = outcome.termination if outcome else None
         return {
             "fen": self.board.fen(),
             "turn": "white" if self.board.turn == chess.WHITE else "black",
             "is_check": self.board.is_check(),
-            "is_checkmate": self.board.is_checkmate(),
-            "is_stalemate": self.board.is_stalemate(),
-            "is_game_over": self.board.is_game_over(),
-            "move_history": self.move_history,
+            "is_checkmate": termination == chess.Termination.CHECKMATE,
+            "is_stalemate": termination == chess.Termination.STALEMATE,
+            "is_game_over": outcome is not None,
+            "move_history": self.get_san_history(),
             "evaluation": self.current_evaluation
         }
     
     def close(self) -> None:
         """Clean up resources by closing the engine."""
+        # Cut the running search short, then let the worker finish so it
+        # is no longer adding to _book_entries while the book is saved
+        analysis = self._analysis
+        if analysis is not None:
+            analysis.stop()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._save_book()
         if self.engine:
             try:
+                self._stop_analysis()
                 self.engine.quit()
             except:
                 pass
+        for engine in self._engine_pool or []:
+            try:
+                engine.quit()
+            except:
+                pass
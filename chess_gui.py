@@ -1,14 +1,47 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+import tkinter.font as tkfont
 import chess
 import threading
 import sys
 import random
 import os
+import logging
+from contextlib import contextmanager
 from typing import Optional, List, Tuple, Dict, Any, Callable
 
 from chess_game import ChessGame
 
+# How often the Tk loop checks on a background engine search
+ENGINE_POLL_MS = 50
+
+# Quiet period after the last resize event before the board is rebuilt
+RESIZE_DEBOUNCE_MS = 80
+
+# Evaluation requests arriving within this window collapse into one
+EVAL_RATE_MS = 200
+
+
+def _no_board_copy_guard():
+    """Warn whenever GUI code copies a chess.Board on the UI thread (debug aid).
+    
+    The GUI should ask the board directly (gives_check, is_capture, is_legal,
+    ...) rather than copy it and push moves; snapshots for background work
+    are ChessGame's job. Enabled by setting CHESS_GUI_DEBUG.
+    """
+    original_copy = chess.Board.copy
+    if getattr(original_copy, "_ui_guard", False):
+        return  # Already installed
+    
+    def guarded_copy(board, *args, **kwargs):
+        caller = sys._getframe(1).f_code
+        if caller.co_filename == __file__ and threading.current_thread() is threading.main_thread():
+            logging.warning(f"chess.Board.copy() called on the UI thread from {caller.co_name}")
+        return original_copy(board, *args, **kwargs)
+    
+    guarded_copy._ui_guard = True
+    chess.Board.copy = guarded_copy
+
 class ChessGUI:
     """GUI implementation for the chess learning platform."""
     
@@ -25,11 +58,30 @@ class ChessGUI:
         self.human_is_white = human_is_white
         self.square_size = 80
         self.selected_piece = None
-        self.legal_moves = []
+        self.legal_moves = set()  # Target squares of the selected piece
         self.flipped = False
         self.hint_arrows = []
         self.last_hint = None
         self._board_needs_update = True
+        self.square_ids = []  # Canvas rectangle per square, built once
+        self.coord_ids = []  # Canvas items for the rank/file labels
+        self._dot_ids = []  # Hidden legal-target dot per square, shown while a piece is selected
+        self._shown_dots = set()  # Squares whose dot is currently visible
+        self._square_colors = []  # Current fill of each square rectangle
+        self._piece_items = {}  # square -> canvas text item of the piece on it
+        self._piece_symbols = {}  # square -> piece symbol drawn there
+        self._piece_bitboards = (0,) * 12  # Per piece type and color, as last drawn
+        self._sq_center = ((), ())  # [flipped][square] -> canvas (x, y) of the square's center
+        self._dirty_squares = set()  # Squares whose highlight may have changed since the last paint
+        self._drawn_last_move = None  # Last move as highlighted on the last paint
+        self._history_len = 0  # Number of plies shown in the move history list
+        self._redraw_pending = False  # A redraw is queued for the next idle
+        self._batch_depth = 0  # Nesting level of batch_updates()
+        self._resize_job = None  # Pending after() id of a debounced resize
+        self._eval_job = None  # Pending after() id of a coalesced evaluation
+        self._last_resize_dims = (0, 0)  # Board area (width, height) of the last resize event
+        self._engine_busy = False  # An engine reply is being searched
+        self._search_id = 0  # Bumped whenever pending search results go stale
         self.practice_mode = game.mode == "Practice"
         self.self_practice_mode = game.mode == "Self-Practice"
         
@@ -51,6 +103,14 @@ class ChessGUI:
             'hint_arrow': 'blue'
         }
         
+        # Unhighlighted color of each square (a1 is dark)
+        self._base_colors = tuple(
+            self.colors['light_square'] if ((sq & 7) + (sq >> 3)) % 2 == 1 else self.colors['dark_square']
+            for sq in range(64))
+        
+        if os.environ.get("CHESS_GUI_DEBUG"):
+            _no_board_copy_guard()
+        
         # Setup the UI
         self.setup_ui()
         
@@ -77,6 +137,10 @@ class ChessGUI:
         self.info_frame = tk.Frame(self.main_frame, width=300, bg='#5A2A0D')
         self.info_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=10, pady=10)
         
+        # Fonts shared by every board glyph, so Tk resolves them only once
+        self._piece_font = tkfont.Font(family='Arial', size=self.square_size // 2)
+        self._coord_font = tkfont.Font(family='Arial', size=10)
+        
         # Chess board
         self.canvas = tk.Canvas(self.board_frame, width=8*self.square_size, 
                               height=8*self.square_size, highlightthickness=0)
@@ -99,10 +163,12 @@ class ChessGUI:
         
         # Event bindings
         self.canvas.bind("<Button-1>", self.on_click)
-        self.master.bind("<Configure>", self.on_window_resize)
+        # Resize on the board area only; a binding on the root would also fire
+        # for every child widget's geometry change
+        self.board_frame.bind("<Configure>", self.on_window_resize)
         
         # Initial draw
-        self.update_display()
+        self._build_static_board()
     
     def create_control_buttons(self):
         """Create control buttons for the chess interface."""
@@ -185,27 +251,42 @@ class ChessGUI:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
     
     def on_window_resize(self, event):
-        """Handle window resize events to adjust the chess board size."""
-        if event.widget == self.master:
-            # Only process if main window was resized
-            board_width = self.board_frame.winfo_width() - 20  # Adjust for padding
-            board_height = self.board_frame.winfo_height() - 100  # Adjust for other widgets
-            
-            new_size = min(board_width // 8, board_height // 8)
-            
-            if new_size > 40 and new_size != self.square_size:  # Minimum square size
-                self.square_size = new_size
-                self.canvas.config(width=8*self.square_size, height=8*self.square_size)
-                self._board_needs_update = True
-                self.update_display()
+        """Handle board area resize events to adjust the chess board size.
+        
+        Tk emits a stream of these while the window edge is dragged, so the
+        board is only rebuilt once the size has settled.
+        """
+        dims = (event.width, event.height)
+        if dims == self._last_resize_dims:
+            return  # Duplicate event, nothing changed
+        self._last_resize_dims = dims
+        
+        board_width = event.width - 20  # Adjust for padding
+        board_height = event.height - 100  # Adjust for other widgets
+        new_size = min(board_width // 8, board_height // 8)
+        
+        if self._resize_job:
+            self.master.after_cancel(self._resize_job)
+        self._resize_job = self.master.after(RESIZE_DEBOUNCE_MS, self._apply_resize, new_size)
+    
+    def _apply_resize(self, new_size):
+        """Resize the board once resize events have stopped arriving."""
+        self._resize_job = None
+        if new_size > 40 and new_size != self.square_size:  # Minimum square size
+            self.square_size = new_size
+            self._piece_font.configure(size=new_size // 2)
+            self.canvas.config(width=8*self.square_size, height=8*self.square_size)
+            self._build_static_board()
+            # Settle the new geometry in one pass. Never call update() from
+            # handlers: it runs pending events re-entrantly, while
+            # update_idletasks() only flushes layout and redraws.
+            self.master.update_idletasks()
     
     def flip_board(self):
         """Flip the board view."""
         self.flipped = not self.flipped
-        self.selected_piece = None
-        self.clear_highlights()
-        self._board_needs_update = True
-        self.update_display()
+        self._set_selection(None)
+        self._build_static_board()
         self.update_explanation("Board flipped")
     
     def toggle_hints(self):
@@ -224,20 +305,21 @@ class ChessGUI:
     
     def take_back_move(self):
         """Undo the last move(s)."""
-        if self.game.mode == "Play":
+        if self.game.mode == "Play" and not self._engine_busy:
             # In Play mode, take back both the engine's move and the human's move
             self.game.undo_move()  # Take back engine move
             self.game.undo_move()  # Take back human move
         else:
-            # In other modes, just take back the last move
+            # In other modes, or while the engine is still thinking about
+            # its reply, just take back the last move
             self.game.undo_move()
+        self._cancel_engine_work()
         
-        self.selected_piece = None
-        self.clear_highlights()
+        self._set_selection(None)
         self._board_needs_update = True
         self.update_move_history()
         self.update_status()
-        self.update_display()
+        self._request_redraw()
         self.update_explanation("Move undone")
     
     def suggest_move(self):
@@ -246,13 +328,20 @@ class ChessGUI:
             self.update_explanation("Game is over")
             return
         
-        best_move = self.game.get_practice_move()
-        if best_move:
+        self._await_engine(self.game.submit_top_k_moves(3), self._show_suggestions)
+    
+    def _show_suggestions(self, candidates):
+        """Display the ranked moves found by suggest_move."""
+        if candidates:
+            best_move = candidates[0]
             self.clear_hints()
             self.last_hint = best_move
             self.draw_arrow(best_move.from_square, best_move.to_square, "blue")
-            explanation = self.generate_move_explanation(best_move)
-            self.update_explanation("Suggested move: " + explanation)
+            explanation = "Suggested move: " + self.generate_move_explanation(best_move)
+            if len(candidates) > 1:
+                alternatives = ", ".join(self.game.board.san(move) for move in candidates[1:])
+                explanation += f"\nAlternatives: {alternatives}"
+            self.update_explanation(explanation)
     
     def show_coach_comment(self):
         """Show coaching comments for the last move."""
@@ -269,7 +358,10 @@ class ChessGUI:
             return
         
         self.clear_hints()
-        best_move = self.game.get_engine_move()
+        self._await_engine(self.game.submit_engine_move(), self._show_hint_move)
+    
+    def _show_hint_move(self, best_move):
+        """Display the move found by show_hint."""
         if best_move:
             self.last_hint = best_move
             self.draw_arrow(best_move.from_square, best_move.to_square, "blue")
@@ -296,53 +388,81 @@ class ChessGUI:
                 explanation += f", capturing {captured_name}"
         
         # Check if move gives check
-        board_copy = self.game.board.copy()
-        board_copy.push(move)
-        if board_copy.is_check():
+        if self.game.board.gives_check(move):
             explanation += ", giving check"
         
         return explanation
     
     def clear_highlights(self):
-        """Clear all highlighted squares on the board."""
-        self.legal_moves = []
-        self.update_display()
+        """Clear all highlighted squares on the board (the caller redraws)."""
+        self.legal_moves = set()
     
     def clear_hints(self):
         """Clear hint arrows from the board."""
+        self.canvas.delete("hint_arrow")
         self.hint_arrows = []
-        self.update_display()
     
     def update_explanation(self, text):
         """Update the explanation text in the UI."""
         self.explanation_label.config(text=text)
     
     def update_evaluation(self):
-        """Update the position evaluation display."""
-        evaluation = self.game.analyze_position()
+        """Schedule an update of the position evaluation display.
+        
+        The engine runs in the background once requests have been quiet for
+        EVAL_RATE_MS, so a burst of moves or take-backs costs one evaluation.
+        """
+        if self._eval_job:
+            self.master.after_cancel(self._eval_job)
+        self._eval_job = self.master.after(EVAL_RATE_MS, self._do_async_eval)
+    
+    def _do_async_eval(self):
+        """Start the evaluation queued by update_evaluation."""
+        self._eval_job = None
+        self._await_engine(self.game.submit_analysis(), self._show_evaluation)
+    
+    def _show_evaluation(self, evaluation):
+        """Display an evaluation computed in the background."""
         self.eval_label.config(text=f"Evaluation: {evaluation}")
     
     def update_move_history(self):
-        """Update the move history display."""
-        self.move_history.delete(0, tk.END)
-        
-        # Display moves in proper format (number. white_move black_move)
-        move_pairs = []
-        for i, move in enumerate(self.game.move_history):
-            if i % 2 == 0:
-                # White's move
-                move_number = i // 2 + 1
-                move_pairs.append(f"{move_number}. {move}")
-            else:
-                # Black's move - append to the last item
-                move_pairs[-1] += f" {move}"
+        """Update the move history display.
         
-        for move_pair in move_pairs:
-            self.move_history.insert(tk.END, move_pair)
+        Rows are only appended or patched for new plies; after a take-back
+        the rows past the remaining moves are removed first.
+        """
+        san_history = self.game.get_san_history()
+        if len(san_history) < self._history_len:
+            # Drop rows back to the last complete move pair still played
+            kept = len(san_history) - len(san_history) % 2
+            self.move_history.delete(kept // 2, tk.END)
+            self._history_len = kept
+        
+        if len(san_history) == self._history_len:
+            return
+        for san in san_history[self._history_len:]:
+            self.append_move_to_history(san)
         
         # Ensure the last move is visible
-        if move_pairs:
-            self.move_history.see(tk.END)
+        self.move_history.see(tk.END)
+    
+    def append_move_to_history(self, san):
+        """Add one ply to the move history display.
+        
+        Args:
+            san: The move in standard algebraic notation
+        """
+        ply = self._history_len
+        if ply % 2 == 0:
+            # White's move starts a new row (number. white_move black_move)
+            self.move_history.insert(tk.END, f"{ply // 2 + 1}. {san}")
+        else:
+            # Black's move - append to the last row
+            idx = self.move_history.size() - 1
+            row = self.move_history.get(idx)
+            self.move_history.delete(idx)
+            self.move_history.insert(idx, f"{row} {san}")
+        self._history_len = ply + 1
     
     def update_status(self):
         """Update the status display with game state information."""
@@ -405,46 +525,47 @@ class ChessGUI:
                         move = chess.Move(self.selected_piece, square, promotion=chess.QUEEN)
             
             # Try to make the move
-            if move in self.game.board.legal_moves:
+            if self.game.board.is_legal(move):
                 self.make_move(move)
             else:
                 # If move is not legal, check if clicked on another own piece
                 if piece and piece.color == self.game.board.turn:
                     # Select the new piece
-                    self.selected_piece = square
-                    self.legal_moves = [move.to_square for move in self.game.board.legal_moves 
-                                      if move.from_square == square]
-                    self.update_display()
+                    self._set_selection(square)
+                    self._request_redraw()
                 else:
                     # Deselect if clicked on empty square or opponent's piece
-                    self.selected_piece = None
-                    self.legal_moves = []
-                    self.update_display()
+                    self._set_selection(None)
+                    self._request_redraw()
         else:
             # No piece selected yet
             if piece and piece.color == self.game.board.turn:
-                self.selected_piece = square
-                self.legal_moves = [move.to_square for move in self.game.board.legal_moves 
-                                  if move.from_square == square]
-                self.update_display()
+                self._set_selection(square)
+                self._request_redraw()
+    
+    def _legal_targets(self, square):
+        """Return the set of squares the piece on square can legally move to."""
+        return {move.to_square for move in
+                self.game.board.generate_legal_moves(from_mask=chess.BB_SQUARES[square])}
     
     def make_move(self, move):
         """Make a move and handle game state updates."""
-        san_move = self.game.board.san(move)
+        # Describe the move while it is still legal in the current position
+        explanation = self.generate_move_explanation(move)
         self.game.make_move(move)
+        self._cancel_engine_work()
         
-        self.selected_piece = None
-        self.legal_moves = []
-        self.clear_hints()
-        self._board_needs_update = True
-        
-        self.update_move_history()
-        self.update_status()
-        self.update_evaluation()
-        self.update_display()
+        with self.batch_updates():
+            self._set_selection(None)
+            self.clear_hints()
+            self._board_needs_update = True
+            
+            self.update_move_history()
+            self.update_status()
+            self.update_evaluation()
+            self._request_redraw()
         
         # Update explanation with the move that was made
-        explanation = self.generate_move_explanation(move)
         self.update_explanation(f"You played: {explanation}")
         
         # If not game over and not in self-practice mode, make engine move
@@ -452,135 +573,286 @@ class ChessGUI:
             self.master.after(500, self.engine_move)  # Delay for better UX
     
     def engine_move(self):
-        """Make a move with the chess engine."""
-        if self.game.board.is_game_over():
+        """Start the engine's search; the move is played once it completes."""
+        if self.game.board.is_game_over() or self._engine_busy or self.is_human_turn():
             return
         
-        # Get engine move
-        engine_move = self.game.get_engine_move()
+        self._engine_busy = True
+        self._await_engine(self.game.submit_engine_move(), self._apply_engine_move)
+    
+    def _apply_engine_move(self, engine_move):
+        """Play the move found by the engine's background search."""
+        self._engine_busy = False
         if not engine_move:
             return
         
+        # Describe the move while its piece is still on the from-square
+        explanation = self.generate_move_explanation(engine_move)
+        
         # Make the move
-        san_move = self.game.board.san(engine_move)
         self.game.make_move(engine_move)
         
-        self._board_needs_update = True
-        self.update_move_history()
-        self.update_status()
-        self.update_evaluation()
-        self.update_display()
-        
-        # Highlight the engine's move
-        from_sq = engine_move.from_square
-        to_sq = engine_move.to_square
-        self.highlight_last_move(from_sq, to_sq)
+        with self.batch_updates():
+            self._board_needs_update = True
+            self.update_move_history()
+            self.update_status()
+            self.update_evaluation()
+            
+            # Highlight the engine's move
+            from_sq = engine_move.from_square
+            to_sq = engine_move.to_square
+            self.highlight_last_move(from_sq, to_sq)
+            self._request_redraw()
         
         # Update explanation with engine's move
-        explanation = self.generate_move_explanation(engine_move)
         self.update_explanation(f"Engine played: {explanation}")
     
+    def _await_engine(self, future, callback):
+        """Hand a background engine result to callback on the UI thread.
+        
+        The search runs on the game's worker thread; the Tk loop polls the
+        future so widgets are only ever touched from this thread. Results
+        that went stale while searching (see _cancel_engine_work) are dropped.
+        """
+        search_id = self._search_id
+        
+        def poll():
+            if search_id != self._search_id:
+                return
+            done, result = self.game.poll_engine_move(future)
+            if not done:
+                self.master.after(ENGINE_POLL_MS, poll)
+                return
+            callback(result)
+        
+        self.master.after(ENGINE_POLL_MS, poll)
+    
+    def _cancel_engine_work(self):
+        """Discard pending engine results after the position changed."""
+        self._search_id += 1
+        self._engine_busy = False
+    
     def highlight_last_move(self, from_square, to_square):
-        """Highlight the last move made on the board."""
-        # Will be implemented in the update_display method
+        """Highlight the last move made on the board (the caller redraws)."""
+        # Drawn by the next update_display
         self.game.last_move = chess.Move(from_square, to_square)
-        self.update_display()
     
     def draw_arrow(self, from_square, to_square, color):
         """Draw an arrow on the board to indicate a suggested move."""
         self.hint_arrows.append((from_square, to_square, color))
-        self.update_display()
+        self.draw_arrow_on_canvas(from_square, to_square, color)
     
     def update_display(self):
         """Update the chess board display."""
-        if not self._board_needs_update and not self.legal_moves and not self.hint_arrows and not self.game.last_move:
-            return  # No need to redraw
+        self._refresh_board()
+    
+    def _request_redraw(self):
+        """Schedule a single board redraw for when Tk is next idle.
         
-        self._board_needs_update = False
-        self.canvas.delete("all")
+        Any number of requests made before then collapse into one paint.
+        Inside batch_updates() the request is held until the batch ends.
+        """
+        if self._redraw_pending:
+            return
+        self._redraw_pending = True
+        if self._batch_depth == 0:
+            self.master.after_idle(self._do_redraw)
+    
+    def _do_redraw(self):
+        """Run the redraw queued by _request_redraw."""
+        if not self._redraw_pending:
+            return
+        self._redraw_pending = False
+        self.update_display()
+    
+    @contextmanager
+    def batch_updates(self):
+        """Group several state changes so they reach the canvas as one redraw."""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._redraw_pending:
+                self.master.after_idle(self._do_redraw)
+    
+    def _square_origin(self, square):
+        """Return the canvas (x, y) of the top-left corner of a square."""
+        file_idx = square & 7
+        rank_idx = square >> 3
+        if self.flipped:
+            return (7 - file_idx) * self.square_size, rank_idx * self.square_size
+        return file_idx * self.square_size, (7 - rank_idx) * self.square_size
+    
+    def _build_static_board(self):
+        """Create the square, label and piece items from scratch.
         
-        # Draw board squares
-        for row in range(8):
-            for col in range(8):
-                x1 = col * self.square_size
-                y1 = (7 - row) * self.square_size if not self.flipped else row * self.square_size
-                x2 = x1 + self.square_size
-                y2 = y1 + self.square_size
-                
-                # Determine square color
-                is_light = (row + col) % 2 == 0
-                color = self.colors['light_square'] if is_light else self.colors['dark_square']
-                
-                # Highlight selected square
-                square = chess.square(col, row if not self.flipped else 7 - row)
-                if self.selected_piece == square:
-                    color = self.colors['selected']
-                # Highlight legal moves
-                elif square in self.legal_moves:
-                    color = self.colors['legal_move']
-                # Highlight last move
-                elif self.game.last_move and (square == self.game.last_move.from_square or 
-                                          square == self.game.last_move.to_square):
-                    color = self.colors['last_move']
-                
-                self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline='')
-                
-                # Draw coordinate labels
-                if col == 0:  # Left edge - row numbers
-                    text_y = y1 + self.square_size // 2
-                    label = str(row + 1) if not self.flipped else str(8 - row)
-                    self.canvas.create_text(5, text_y, text=label, anchor=tk.W, 
-                                          font=('Arial', 10), fill='black' if is_light else 'white')
-                
-                if row == 7 if not self.flipped else row == 0:  # Bottom edge - column letters
-                    text_x = x1 + self.square_size // 2
-                    label = chr(97 + col)  # 'a' through 'h'
-                    self.canvas.create_text(text_x, y2 - 5, text=label, anchor=tk.S, 
-                                          font=('Arial', 10), fill='black' if is_light else 'white')
-        
-        # Draw pieces
+        Only needed at startup and when the geometry changes (resize, flip);
+        everything else goes through _refresh_board, which edits these items
+        in place.
+        """
+        self.canvas.delete("all")
+        self._build_square_centers()
+        self.square_ids = [None] * 64
+        self._square_colors = [None] * 64
+        self.coord_ids = []
+        self._piece_items = {}
+        self._piece_symbols = {}
+        self._piece_bitboards = (0,) * 12
+        self._drawn_last_move = None
+        
+        size = self.square_size
         for square in chess.SQUARES:
-            piece = self.game.board.piece_at(square)
-            if piece:
-                file_idx = chess.square_file(square)
-                rank_idx = chess.square_rank(square)
-                
-                if self.flipped:
-                    x = (7 - file_idx) * self.square_size + self.square_size // 2
-                    y = rank_idx * self.square_size + self.square_size // 2
-                else:
-                    x = file_idx * self.square_size + self.square_size // 2
-                    y = (7 - rank_idx) * self.square_size + self.square_size // 2
-                
-                piece_symbol = self.piece_chars[piece.symbol()]
-                color = self.colors['white_piece'] if piece.color == chess.WHITE else self.colors['black_piece']
-                
-                self.canvas.create_text(x, y, text=piece_symbol, font=('Arial', self.square_size//2), 
-                                      fill=color, tags="piece")
-        
-        # Draw hint arrows
+            x1, y1 = self._square_origin(square)
+            color = self._base_colors[square]
+            self.square_ids[square] = self.canvas.create_rectangle(
+                x1, y1, x1 + size, y1 + size, fill=color, outline='')
+            self._square_colors[square] = color
+            
+            # Coordinate labels on the left and bottom edges
+            label_color = 'black' if color == self.colors['light_square'] else 'white'
+            if x1 == 0:
+                self.coord_ids.append(self.canvas.create_text(
+                    5, y1 + size // 2, text=str((square >> 3) + 1), anchor=tk.W,
+                    font=self._coord_font, fill=label_color))
+            if y1 == 7 * size:
+                self.coord_ids.append(self.canvas.create_text(
+                    x1 + size // 2, y1 + size - 5, text=chess.FILE_NAMES[square & 7],
+                    anchor=tk.S, font=self._coord_font, fill=label_color))
+        
+        # Legal-target dots are created once and only shown or hidden later
+        radius = max(size // 8, 4)
+        self._dot_ids = []
+        for x, y in self._sq_center[self.flipped]:
+            self._dot_ids.append(self.canvas.create_oval(
+                x - radius, y - radius, x + radius, y + radius,
+                fill=self.colors['legal_move'], outline='', state='hidden', tags="legal_dot"))
+        self._shown_dots = set()
+        
+        self._board_needs_update = True
+        self._dirty_squares.update(chess.SQUARES)
+        self._refresh_board()
+        
+        # Arrows live on their own "hint_arrow" overlay outside the refresh cycle
         for from_square, to_square, color in self.hint_arrows:
             self.draw_arrow_on_canvas(from_square, to_square, color)
     
+    def _build_square_centers(self):
+        """Precompute the center of every square for both orientations."""
+        size = self.square_size
+        half = size // 2
+        self._sq_center = (
+            tuple(((sq & 7) * size + half, (7 - (sq >> 3)) * size + half)
+                  for sq in chess.SQUARES),
+            tuple(((7 - (sq & 7)) * size + half, (sq >> 3) * size + half)
+                  for sq in chess.SQUARES),
+        )
+    
+    def _set_selection(self, square):
+        """Select the piece on square (None to deselect) and its legal targets."""
+        self.clear_highlights()
+        if self.selected_piece is not None:
+            self._dirty_squares.add(self.selected_piece)
+        self.selected_piece = square
+        if square is not None:
+            self.legal_moves = self._legal_targets(square)
+            self._dirty_squares.add(square)
+    
+    def _square_color(self, square):
+        """Return the fill a square should have, highlights included."""
+        if square == self.selected_piece:
+            return self.colors['selected']
+        last_move = self.game.last_move
+        if last_move and (square == last_move.from_square or square == last_move.to_square):
+            return self.colors['last_move']
+        return self._base_colors[square]
+    
+    def _refresh_board(self):
+        """Bring the canvas in line with the game, touching only what changed."""
+        # The game updates last_move itself, so pick up changes to it here
+        last_move = self.game.last_move
+        if last_move != self._drawn_last_move:
+            for move in (self._drawn_last_move, last_move):
+                if move:
+                    self._dirty_squares.update((move.from_square, move.to_square))
+            self._drawn_last_move = last_move
+        
+        # Recolor only the squares whose highlight may have changed
+        for square in self._dirty_squares:
+            color = self._square_color(square)
+            if self._square_colors[square] != color:
+                self.canvas.itemconfig(self.square_ids[square], fill=color)
+                self._square_colors[square] = color
+        self._dirty_squares.clear()
+        
+        # Show the dots on the current legal targets, hide the stale ones
+        for square in self._shown_dots - self.legal_moves:
+            self.canvas.itemconfig(self._dot_ids[square], state='hidden')
+        for square in self.legal_moves - self._shown_dots:
+            self.canvas.itemconfig(self._dot_ids[square], state='normal')
+        self._shown_dots = set(self.legal_moves)
+        
+        if self._board_needs_update:
+            self._board_needs_update = False
+            self._sync_pieces()
+            # Keep the dots visible on top of capturable pieces, arrows above all
+            self.canvas.tag_raise("legal_dot")
+            self.canvas.tag_raise("hint_arrow")
+    
+    def _sync_pieces(self):
+        """Move, create or delete piece items so they match the board.
+        
+        Only squares whose contents differ from what was last drawn are
+        visited: XOR-ing the old and new piece bitboards leaves just those
+        (two for a normal move, three or four for en passant and castling).
+        """
+        board = self.game.board
+        bitboards = tuple(
+            mask & board.occupied_co[color]
+            for color in chess.COLORS
+            for mask in (board.pawns, board.knights, board.bishops,
+                         board.rooks, board.queens, board.kings))
+        changed = 0
+        for old, new in zip(self._piece_bitboards, bitboards):
+            changed |= old ^ new
+        self._piece_bitboards = bitboards
+        squares = list(chess.scan_forward(changed))
+        
+        # Items that left a square, grouped by symbol so a moved piece can be reused
+        spare = {}
+        for square in squares:
+            if square in self._piece_items:
+                spare.setdefault(self._piece_symbols.pop(square), []).append(self._piece_items.pop(square))
+        
+        centers = self._sq_center[self.flipped]
+        for square in squares:
+            piece = board.piece_at(square)
+            if piece is None:
+                continue
+            symbol = piece.symbol()
+            x, y = centers[square]
+            if spare.get(symbol):
+                item = spare[symbol].pop()
+                self.canvas.coords(item, x, y)
+            else:
+                color = self.colors['white_piece'] if symbol.isupper() else self.colors['black_piece']
+                item = self.canvas.create_text(x, y, text=self.piece_chars[symbol],
+                                               font=self._piece_font, fill=color, tags="piece")
+            self._piece_items[square] = item
+            self._piece_symbols[square] = symbol
+        
+        for items in spare.values():
+            for item in items:
+                self.canvas.delete(item)
+    
     def draw_arrow_on_canvas(self, from_square, to_square, color):
         """Draw an arrow between two squares on the canvas."""
-        from_file = chess.square_file(from_square)
-        from_rank = chess.square_rank(from_square)
-        to_file = chess.square_file(to_square)
-        to_rank = chess.square_rank(to_square)
-        
-        if self.flipped:
-            from_x = (7 - from_file) * self.square_size + self.square_size // 2
-            from_y = from_rank * self.square_size + self.square_size // 2
-            to_x = (7 - to_file) * self.square_size + self.square_size // 2
-            to_y = to_rank * self.square_size + self.square_size // 2
-        else:
-            from_x = from_file * self.square_size + self.square_size // 2
-            from_y = (7 - from_rank) * self.square_size + self.square_size // 2
-            to_x = to_file * self.square_size + self.square_size // 2
-            to_y = (7 - to_rank) * self.square_size + self.square_size // 2
+        centers = self._sq_center[self.flipped]
+        from_x, from_y = centers[from_square]
+        to_x, to_y = centers[to_square]
         
         # Draw arrow line
         self.canvas.create_line(from_x, from_y, to_x, to_y, 
-                              fill=color, width=3, arrow=tk.LAST, arrowshape=(16, 20, 6))
+                              fill=color, width=3, arrow=tk.LAST, arrowshape=(16, 20, 6),
+                              tags="hint_arrow")
 
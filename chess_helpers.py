@@ -0,0 +1,109 @@
+"""Pure helpers for the API's per-move text and status fields.
+
+Kept free of Flask so the module can be compiled to a C extension with
+mypyc (``mypyc chess_helpers.py``); main.py imports it the same way
+either way.
+"""
+from typing import Final, Optional
+
+import chess
+
+# Coach comment rules, one bit each; sentences are joined in bit order
+COACH_CAPTURE: Final = 1
+COACH_CHECK: Final = 2
+COACH_CENTER: Final = 4
+COACH_DEVELOPMENT: Final = 8
+COACH_CASTLING: Final = 16
+COACH_SENTENCES: Final[tuple[str, ...]] = (
+    "Good capture! Taking the {captured} gains material advantage.",
+    "Nice check! Putting pressure on the opponent's king.",
+    "Good central control! Controlling the center is important in chess.",
+    "Good development! Getting your pieces into play early is a key principle.",
+    "Good castling! This move protects your king and connects your rooks.",
+)
+# The comment for every combination of rules, indexed by rule mask
+COACH_COMMENTS: Final[tuple[str, ...]] = tuple(
+    " ".join(text for bit, text in enumerate(COACH_SENTENCES) if mask >> bit & 1)
+    for mask in range(1 << len(COACH_SENTENCES))
+)
+
+CENTRAL_SQUARES: Final[frozenset[int]] = frozenset((chess.E4, chess.D4, chess.E5, chess.D5))
+CENTER_PIECES: Final[frozenset[int]] = frozenset((chess.PAWN, chess.KNIGHT))
+MINOR_PIECES: Final[frozenset[int]] = frozenset((chess.KNIGHT, chess.BISHOP))
+
+
+def status_dict(board: chess.Board) -> dict[str, object]:
+    """Game status fields for API responses, from a single outcome() check"""
+    outcome: Optional[chess.Outcome] = board.outcome()
+    return {
+        'isCheck': board.is_check(),
+        'isCheckmate': outcome is not None and outcome.termination == chess.Termination.CHECKMATE,
+        'isStalemate': outcome is not None and outcome.termination == chess.Termination.STALEMATE,
+        'isGameOver': outcome is not None,
+        'turn': 'white' if board.turn == chess.WHITE else 'black',
+    }
+
+
+def explain_move(board: chess.Board, move: chess.Move) -> str:
+    """Describe a move in plain words, from the position before it is played"""
+    piece = board.piece_at(move.from_square)
+    if not piece:
+        return "Invalid move"
+    
+    piece_name = chess.piece_name(piece.piece_type).capitalize()
+    from_sq = chess.square_name(move.from_square)
+    to_sq = chess.square_name(move.to_square)
+    
+    explanation = f"{piece_name} from {from_sq} to {to_sq}"
+    
+    # Check if move is a capture
+    if board.is_capture(move):
+        captured = board.piece_at(move.to_square)
+        if captured:
+            captured_name = chess.piece_name(captured.piece_type)
+            explanation += f", capturing {captured_name}"
+    
+    # Check if move gives check
+    if board.gives_check(move):
+        explanation += ", giving check"
+    
+    return explanation
+
+
+def generate_coach_comment(board: chess.Board, move: chess.Move) -> str:
+    """Generate coaching comments for a move"""
+    # Get piece info
+    piece = board.piece_at(move.from_square)
+    if not piece:
+        return "Unable to analyze this move."
+    
+    piece_type: int = piece.piece_type
+    opening: bool = board.fullmove_number <= 10
+    
+    # Check detection works on the position before the move
+    is_capture: bool = board.is_capture(move)
+    mask: int = (
+        is_capture * COACH_CAPTURE
+        | board.gives_check(move) * COACH_CHECK
+        | (move.to_square in CENTRAL_SQUARES and piece_type in CENTER_PIECES) * COACH_CENTER
+        # Minor piece leaving the back rank in the opening
+        | (opening and piece_type in MINOR_PIECES
+           and bool(chess.BB_SQUARES[move.from_square] & chess.BB_BACKRANKS)) * COACH_DEVELOPMENT
+        | (piece_type == chess.KING and abs(move.from_square - move.to_square) == 2) * COACH_CASTLING
+    )
+    
+    # If no specific comments, give general advice
+    if not mask:
+        if opening:
+            return "Remember to focus on development, central control, and king safety in the opening."
+        elif board.fullmove_number <= 25:
+            return "In the middlegame, look for tactical opportunities and strategic advantages."
+        else:
+            return "In the endgame, activate your king and try to promote your pawns."
+    
+    comment = COACH_COMMENTS[mask]
+    if is_capture:
+        captured_piece = board.piece_at(move.to_square)
+        captured_name = chess.piece_name(captured_piece.piece_type) if captured_piece else "piece"
+        comment = comment.format(captured=captured_name)
+    return comment
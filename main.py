@@ -1,4 +1,5 @@
 from flask import Flask, render_template, jsonify, request
+from flask.json.provider import JSONProvider
 import os
 import logging
 import chess
@@ -7,321 +8,568 @@ import chess.pgn
 import io
 import random
 import threading
+import queue
+import itertools
 import time
 import json
+import orjson
+from pydantic import BaseModel, ValidationError
+import atexit
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from concurrent.futures import ThreadPoolExecutor
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+from chess_helpers import explain_move, generate_coach_comment, status_dict
+
+# Configure logging; set LOG_LEVEL=DEBUG when developing
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'WARNING').upper())
+# chess.engine logs every UCI line it sends and receives at DEBUG
+logging.getLogger('chess.engine').setLevel(logging.WARNING)
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider that makes jsonify (and request.get_json) use orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping the str round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.environ.get("SESSION_SECRET", "chess-learning-platform-secret")
 
+class GameMode(IntEnum):
+    """Game modes offered by the client"""
+    PLAY = 1
+    PRACTICE = 2
+    SELF_PRACTICE = 3
+
+# Mode names as sent by the client's mode selector
+GAME_MODES = {
+    'Play': GameMode.PLAY,
+    'Practice': GameMode.PRACTICE,
+    'Self-Practice': GameMode.SELF_PRACTICE,
+}
+
+# Request bodies, parsed and validated straight from the raw JSON by pydantic.
+# Missing fields keep the defaults the endpoints have always used.
+class NewGameRequest(BaseModel):
+    mode: str = 'Play'
+    color: str = 'white'
+
+class GameRequest(BaseModel):
+    """Body of endpoints that only name a game"""
+    gameId: str = ''
+
+class MoveRequest(GameRequest):
+    uci: str = ''
+
+class DifficultyRequest(GameRequest):
+    difficulty: int = 3
+
+class CoachCommentRequest(GameRequest):
+    moveIdx: int = -1
+
+@dataclass(slots=True)
+class Game:
+    """State of one game served by the API"""
+    board: chess.Board
+    mode: GameMode
+    human_is_white: bool
+    difficulty: int = 3
+    show_hints: bool = True
+    move_history: list = field(default_factory=list)  # SAN of each move
+    last_engine_hint: dict | None = None
+    moves: list = field(default_factory=list)  # UCI string of each move, parallel to move_history
+    fens: list = field(default_factory=list)  # Position before each move; fens[-1] is the current one
+    last_touched: float = field(default_factory=time.monotonic)
+    # Held while a request changes the board and the move lists
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
 # Global variables to store active games
-active_games = {}
+# (least recently used first; see _get_game / _add_game)
+active_games: OrderedDict[str, Game] = OrderedDict()
+games_lock = threading.Lock()
+# Game ids; next() on a count is atomic, so concurrent new_game calls never share one
+_game_ids = itertools.count(1)
 engine_path = os.environ.get("STOCKFISH_PATH", "/usr/games/stockfish")
-engine_lock = threading.Lock()
+
+# Single-threaded engine processes searching in parallel, one per request
+ENGINE_POOL_SIZE = int(os.environ.get("ENGINE_POOL_SIZE", max(1, (os.cpu_count() or 2) // 2)))
+
+# Maximum number of positions kept in the analysis / best-move caches
+TT_SIZE = 100_000
+
+# Depth the background analysis deepens each new position to
+BACKGROUND_DEPTH = 15
+
+# Engine think time per difficulty level (1-4), built once
+PLAY_LIMITS = {d: chess.engine.Limit(time=0.5 * d) for d in (1, 2, 3, 4)}
+
+# Most games kept in memory, and how long an untouched game survives
+MAX_GAMES = 1024
+GAME_IDLE_SECONDS = 30 * 60
+JANITOR_INTERVAL_SECONDS = 60
 
 class ChessGameManager:
     """Manages chess games and engine interactions"""
     
-    def __init__(self, engine_path):
+    def __init__(self, engine_path, pool_size=ENGINE_POOL_SIZE):
         self.engine_path = engine_path
-        self.engine = None
+        self.pool_size = pool_size
+        self.engines = []  # Every engine process, for shutdown
+        self._pool = queue.Queue()  # Engines not currently searching
+        # Transposition caches keyed by board._transposition_key(), LRU ordered
+        self._tt = OrderedDict()  # key -> {"score", "mate", "depth"}
+        self._best_move_cache = OrderedDict()  # (key, depth) -> (move uci, explanation)
+        self._tt_lock = threading.Lock()
+        # Background analysis: one worker, only the latest position is deepened
+        self._analysis_executor = ThreadPoolExecutor(max_workers=1)
+        self._analysis = None  # Running engine.analysis() stream, if any
+        self._analysis_gen = 0  # Bumped to abandon queued or running analyses
         self.init_engine()
     
     def init_engine(self):
         try:
-            self.engine = chess.engine.SimpleEngine.popen_uci(self.engine_path)
-            # Configure engine with optimal settings
-            try:
-                self.engine.configure({
-                    "Skill Level": 20,
-                    "Threads": 2,
-                    "Hash": 128,
-                })
-            except chess.engine.EngineError:
-                # Some engines don't support these options
-                pass
-            logging.info("Chess engine initialized successfully")
+            for _ in range(self.pool_size):
+                engine = chess.engine.SimpleEngine.popen_uci(self.engine_path)
+                # Configure engine with optimal settings
+                try:
+                    engine.configure({
+                        "Skill Level": 20,
+                        "Threads": 1,  # Parallelism comes from the pool instead
+                        "Hash": 256,  # Kept warm across a game's searches, see game_id below
+                    })
+                except chess.engine.EngineError:
+                    # Some engines don't support these options
+                    pass
+                self.engines.append(engine)
+                self._pool.put(engine)
+            logging.info("Chess engine pool initialized with %s engines", len(self.engines))
         except Exception as e:
-            logging.error(f"Failed to initialize chess engine: {e}")
-            # Fallback to random move generator if engine fails
-            self.engine = None
+            logging.error("Failed to initialize chess engine: %s", e)
+            # Keep the engines that did start; with none, fall back to random moves
     
-    def get_engine_move(self, board, difficulty=3):
-        if not self.engine:
+    @contextmanager
+    def _acquire(self):
+        """Check an engine out of the pool and return it when done.
+        
+        If every engine is busy, the background analysis is stopped so that
+        its engine frees up for this request.
+        """
+        try:
+            engine = self._pool.get_nowait()
+        except queue.Empty:
+            self._interrupt_analysis()
+            engine = self._pool.get()
+        try:
+            yield engine
+        finally:
+            self._pool.put(engine)
+    
+    # Engine calls take the game_id of the board they search. python-chess
+    # sends "ucinewgame" (which clears Stockfish's hash) only when an engine
+    # sees a different game than its last search, so a game that lands on
+    # the same pool engine again reuses its hash, history and killer tables
+    # while different games stay isolated.
+    
+    def get_engine_move(self, board, difficulty=3, game_id=None):
+        if not self.engines:
             return self.get_random_move(board)
         
         try:
-            # Adjust time based on difficulty
-            think_time = 0.5 * difficulty
-            
-            with engine_lock:  # Use lock to prevent concurrent engine access
-                result = self.engine.play(
+            # Only the move is used, so don't ask for (and parse) search info
+            with self._acquire() as engine:
+                result = engine.play(
                     board,
-                    chess.engine.Limit(time=think_time),
-                    info=chess.engine.INFO_ALL
+                    PLAY_LIMITS[difficulty],
+                    info=chess.engine.INFO_NONE,
+                    game=game_id
                 )
             
             if result and result.move:
                 return result.move
             return self.get_random_move(board)
         except Exception as e:
-            logging.error(f"Engine error: {e}")
+            logging.error("Engine error: %s", e)
             return self.get_random_move(board)
     
     def get_random_move(self, board):
+        # One generation pass is the cheapest option: legal_moves.count()
+        # generates the moves itself, so count-then-index walks them twice
         legal_moves = list(board.legal_moves)
         if legal_moves:
             return random.choice(legal_moves)
         return None
     
-    def analyze_position(self, board, depth=15):
-        if not self.engine:
+    def _cache_get(self, cache, key):
+        with self._tt_lock:
+            entry = cache.get(key)
+            if entry is not None:
+                cache.move_to_end(key)
+            return entry
+    
+    def _cache_put(self, cache, key, entry):
+        with self._tt_lock:
+            cache[key] = entry
+            cache.move_to_end(key)
+            if len(cache) > TT_SIZE:
+                cache.popitem(last=False)
+    
+    @staticmethod
+    def _score_dict(score):
+        if score:
+            if score.is_mate():
+                mate = score.white().mate()
+                return {"score": None, "mate": mate}
+            else:
+                cp = score.white().score() / 100.0
+                return {"score": cp, "mate": None}
+        return {"score": 0.0, "mate": None}
+    
+    def analyze_position(self, board, depth=15, game_id=None):
+        if not self.engines:
             return {"score": 0.0, "mate": None}
         
+        # Reuse a stored evaluation that was searched at least this deep
+        key = board._transposition_key()
+        entry = self._cache_get(self._tt, key)
+        if entry is not None and entry["depth"] >= depth:
+            return {"score": entry["score"], "mate": entry["mate"]}
+        
         try:
-            with engine_lock:
-                info = self.engine.analyse(board, chess.engine.Limit(depth=depth))
+            with self._acquire() as engine:
+                info = engine.analyse(board, chess.engine.Limit(depth=depth), game=game_id)
                 
-            score = info.get("score", None)
-            if score:
-                if score.is_mate():
-                    mate = score.mate()
-                    return {"score": None, "mate": mate}
-                else:
-                    cp = score.white().score() / 100.0
-                    return {"score": cp, "mate": None}
-            return {"score": 0.0, "mate": None}
+            result = self._score_dict(info.get("score", None))
+            self._cache_put(self._tt, key, {**result, "depth": info.get("depth", depth)})
+            return result
         except Exception as e:
-            logging.error(f"Analysis error: {e}")
+            logging.error("Analysis error: %s", e)
             return {"score": 0.0, "mate": None}
     
-    def get_best_move(self, board):
-        if not self.engine:
+    def latest_evaluation(self, board):
+        """Return the deepest stored evaluation of board, or None if there is none yet"""
+        entry = self._cache_get(self._tt, board._transposition_key())
+        if entry is None:
+            return None
+        return {"score": entry["score"], "mate": entry["mate"], "depth": entry["depth"]}
+    
+    def schedule_analysis(self, board, game_id=None):
+        """Deepen the evaluation of board in the background.
+        
+        Results stream into the transposition cache depth by depth, so
+        latest_evaluation returns the best-so-far score immediately. Any
+        analysis still queued or running for an older position is abandoned.
+        """
+        if not self.engines:
+            return
+        self._interrupt_analysis()
+        self._analysis_executor.submit(self._background_analysis, board, game_id, self._analysis_gen)
+    
+    def _interrupt_analysis(self):
+        # Bump the generation before looking at the running analysis, so a
+        # worker that has just started either sees the new generation or is
+        # seen (and stopped) here
+        self._analysis_gen += 1
+        analysis = self._analysis
+        if analysis is not None:
+            analysis.stop()
+    
+    def _background_analysis(self, board, game_id, gen):
+        if gen != self._analysis_gen:
+            return  # Superseded while queued
+        key = board._transposition_key()
+        entry = self._cache_get(self._tt, key)
+        if entry is not None and entry["depth"] >= BACKGROUND_DEPTH:
+            return
+        
+        # Only use an idle engine; requests waiting on the pool come first
+        try:
+            engine = self._pool.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            if gen != self._analysis_gen:
+                return
+            analysis = engine.analysis(board, chess.engine.Limit(depth=BACKGROUND_DEPTH), game=game_id)
+            self._analysis = analysis
+            try:
+                if gen != self._analysis_gen:
+                    analysis.stop()
+                # The engine deepens iteratively; store every completed depth
+                for info in analysis:
+                    score = info.get("score")
+                    if score is None or info.get("lowerbound") or info.get("upperbound"):
+                        continue
+                    depth = info.get("depth", 0)
+                    entry = self._cache_get(self._tt, key)
+                    if entry is None or entry["depth"] <= depth:
+                        self._cache_put(self._tt, key, {**self._score_dict(score), "depth": depth})
+            finally:
+                self._analysis = None
+        except Exception as e:
+            logging.error("Background analysis error: %s", e)
+        finally:
+            self._pool.put(engine)
+    
+    def get_best_move(self, board, depth=15, game_id=None):
+        if not self.engines:
             return self.get_random_move(board), "No engine available"
         
+        key = (board._transposition_key(), depth)
+        cached = self._cache_get(self._best_move_cache, key)
+        if cached is not None:
+            return chess.Move.from_uci(cached[0]), cached[1]
+        
         try:
-            with engine_lock:
-                result = self.engine.play(
+            with self._acquire() as engine:
+                result = engine.play(
                     board,
-                    chess.engine.Limit(depth=15),
-                    info=chess.engine.INFO_ALL
+                    chess.engine.Limit(depth=depth),
+                    info=chess.engine.INFO_ALL,
+                    game=game_id
                 )
             
             move = result.move
-            return move, self.explain_move(board, move)
+            explanation = explain_move(board, move)
+            self._cache_put(self._best_move_cache, key, (move.uci(), explanation))
+            return move, explanation
         except Exception as e:
-            logging.error(f"Best move error: {e}")
+            logging.error("Best move error: %s", e)
             return self.get_random_move(board), "Engine error"
     
-    def explain_move(self, board, move):
-        piece = board.piece_at(move.from_square)
-        if not piece:
-            return "Invalid move"
-        
-        piece_name = chess.piece_name(piece.piece_type).capitalize()
-        from_sq = chess.square_name(move.from_square)
-        to_sq = chess.square_name(move.to_square)
-        
-        explanation = f"{piece_name} from {from_sq} to {to_sq}"
-        
-        # Check if move is a capture
-        if board.is_capture(move):
-            captured = board.piece_at(move.to_square)
-            if captured:
-                captured_name = chess.piece_name(captured.piece_type)
-                explanation += f", capturing {captured_name}"
-        
-        # Check if move gives check
-        board_copy = board.copy()
-        board_copy.push(move)
-        if board_copy.is_check():
-            explanation += ", giving check"
-        
-        return explanation
-    
     def close(self):
-        if self.engine:
+        self._interrupt_analysis()
+        self._analysis_executor.shutdown(wait=True)
+        for engine in self.engines:
             try:
-                self.engine.quit()
+                engine.quit()
             except:
                 pass
 
 # Initialize the game manager
 game_manager = ChessGameManager(engine_path)
 
+def _record_move(game, move):
+    """Push move on the game's board and record it; returns the move's SAN"""
+    board = game.board
+    san = board.san(move)
+    board.push(move)
+    game.move_history.append(san)
+    game.moves.append(move.uci())
+    # The one fen() per move; responses reuse it as game.fens[-1]
+    game.fens.append(board.fen())
+    return san
+
+def _get_game(game_id):
+    """Look up a game and mark it as recently used; None if unknown"""
+    if not game_id:
+        return None
+    with games_lock:
+        game = active_games.get(game_id)
+        if game is not None:
+            active_games.move_to_end(game_id)
+            game.last_touched = time.monotonic()
+        return game
+
+def _add_game(game_id, game):
+    """Store a new game, evicting the least recently used one when full"""
+    with games_lock:
+        while len(active_games) >= MAX_GAMES:
+            active_games.popitem(last=False)
+        active_games[game_id] = game
+
+def _evict_idle_games():
+    """Janitor loop: drop games nobody has touched for GAME_IDLE_SECONDS"""
+    while True:
+        time.sleep(JANITOR_INTERVAL_SECONDS)
+        cutoff = time.monotonic() - GAME_IDLE_SECONDS
+        with games_lock:
+            # Oldest first, so stop at the first game that is still fresh
+            while active_games:
+                game_id, game = next(iter(active_games.items()))
+                if game.last_touched > cutoff:
+                    break
+                del active_games[game_id]
+                logging.debug("Evicted idle game %s", game_id)
+
+threading.Thread(target=_evict_idle_games, name="game-janitor", daemon=True).start()
+
+def _undo_move(game):
+    """Take back the game's last move, if any"""
+    board = game.board
+    if board.move_stack:
+        board.pop()
+        game.move_history.pop()
+        game.moves.pop()
+        game.fens.pop()
+
+@app.errorhandler(ValidationError)
+def invalid_request(e):
+    return jsonify({'error': 'Invalid request'}), 400
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/api/new_game', methods=['POST'])
 def new_game():
-    data = request.json
-    game_mode = data.get('mode', 'Play')
-    human_is_white = data.get('color', 'white') == 'white'
-    
-    game_id = str(int(time.time()))
+    data = NewGameRequest.model_validate_json(request.get_data())
+    game_mode = GAME_MODES.get(data.mode)
+    if game_mode is None:
+        return jsonify({'error': 'Invalid game mode'}), 400
+    human_is_white = data.color == 'white'
+    
+    game_id = str(next(_game_ids))
+    # Board() sets the starting position straight from bitboards (no FEN
+    # parse), which is faster than copying a prebuilt board
     board = chess.Board()
     
-    active_games[game_id] = {
-        'board': board,
-        'mode': game_mode,
-        'human_is_white': human_is_white,
-        'difficulty': 3,
-        'show_hints': True,
-        'move_history': [],
-        'last_engine_hint': None
-    }
+    game = Game(
+        board=board,
+        mode=game_mode,
+        human_is_white=human_is_white,
+        fens=[chess.STARTING_FEN],
+    )
+    _add_game(game_id, game)
     
     # If player is black, make first move as white
-    if not human_is_white and game_mode != 'Self-Practice':
-        engine_move = game_manager.get_engine_move(board, 3)
+    if not human_is_white and game_mode is not GameMode.SELF_PRACTICE:
+        engine_move = game_manager.get_engine_move(board, 3, game_id)
         if engine_move:
-            board.push(engine_move)
-            active_games[game_id]['move_history'].append(board.san(engine_move))
+            # SAN must be computed before the move is pushed
+            _record_move(game, engine_move)
     
     return jsonify({
         'gameId': game_id,
-        'fen': board.fen(),
-        'isCheck': board.is_check(),
-        'isCheckmate': board.is_checkmate(),
-        'isStalemate': board.is_stalemate(),
-        'isGameOver': board.is_game_over(),
-        'turn': 'white' if board.turn == chess.WHITE else 'black',
-        'moveHistory': active_games[game_id]['move_history']
+        'fen': game.fens[-1],
+        **status_dict(board),
+        'moveHistory': game.move_history
     })
 
 @app.route('/api/move', methods=['POST'])
 def make_move():
-    data = request.json
-    game_id = data.get('gameId')
-    from_square = data.get('from')
-    to_square = data.get('to')
+    data = MoveRequest.model_validate_json(request.get_data())
+    game_id = data.gameId
     
-    if not game_id or game_id not in active_games:
+    game = _get_game(game_id)
+    if game is None:
         return jsonify({'error': 'Invalid game ID'}), 400
     
-    game = active_games[game_id]
-    board = game['board']
-    
-    # Convert algebraic notation to square indices
-    from_idx = chess.parse_square(from_square)
-    to_idx = chess.parse_square(to_square)
-    
-    # Check if promotion is needed
-    promotion = None
-    piece = board.piece_at(from_idx)
-    if piece and piece.piece_type == chess.PAWN:
-        if (chess.square_rank(to_idx) == 7 and piece.color == chess.WHITE) or \
-           (chess.square_rank(to_idx) == 0 and piece.color == chess.BLACK):
-            promotion = chess.QUEEN
-    
-    # Create move object
-    try:
-        if promotion:
-            move = chess.Move(from_idx, to_idx, promotion)
-        else:
-            move = chess.Move(from_idx, to_idx)
-    except ValueError:
-        return jsonify({'error': 'Invalid move format'}), 400
-    
-    # Check if move is legal
-    if move not in board.legal_moves:
-        return jsonify({'error': 'Illegal move'}), 400
-    
-    # Make the move
-    san_move = board.san(move)
-    board.push(move)
-    game['move_history'].append(san_move)
-    
-    response = {
-        'fen': board.fen(),
-        'isCheck': board.is_check(),
-        'isCheckmate': board.is_checkmate(),
-        'isStalemate': board.is_stalemate(),
-        'isGameOver': board.is_game_over(),
-        'turn': 'white' if board.turn == chess.WHITE else 'black',
-        'lastMove': {
-            'from': from_square,
-            'to': to_square,
-            'san': san_move
-        },
-        'moveHistory': game['move_history']
-    }
-    
-    # In Play mode, make engine move after human move
-    if game['mode'] == 'Play' and not board.is_game_over():
-        is_human_turn = (game['human_is_white'] and board.turn == chess.WHITE) or \
-                        (not game['human_is_white'] and board.turn == chess.BLACK)
+    # Hold the game across the engine reply so a concurrent move or undo
+    # can't change the board and history lists underneath it
+    with game.lock:
+        board = game.board
         
-        if not is_human_turn:
-            engine_move = game_manager.get_engine_move(board, game['difficulty'])
-            if engine_move:
-                engine_san = board.san(engine_move)
-                board.push(engine_move)
-                game['move_history'].append(engine_san)
-                
-                response.update({
-                    'fen': board.fen(),
-                    'isCheck': board.is_check(),
-                    'isCheckmate': board.is_checkmate(),
-                    'isStalemate': board.is_stalemate(),
-                    'isGameOver': board.is_game_over(),
-                    'turn': 'white' if board.turn == chess.WHITE else 'black',
-                    'engineMove': {
-                        'from': chess.square_name(engine_move.from_square),
-                        'to': chess.square_name(engine_move.to_square),
+        # The client sends the move in UCI, promotion piece included (e.g. e7e8n)
+        try:
+            move = chess.Move.from_uci(data.uci)
+        except ValueError:
+            return jsonify({'error': 'Invalid move format'}), 400
+        
+        # Check if move is legal
+        if not board.is_legal(move):
+            return jsonify({'error': 'Illegal move'}), 400
+        
+        # Make the move
+        san_move = _record_move(game, move)
+        status = status_dict(board)
+        engine_reply = None
+        
+        # In Play mode, make engine move after human move
+        if game.mode is GameMode.PLAY and not status['isGameOver']:
+            is_human_turn = (game.human_is_white and board.turn == chess.WHITE) or \
+                            (not game.human_is_white and board.turn == chess.BLACK)
+        
+            if not is_human_turn:
+                engine_move = game_manager.get_engine_move(board, game.difficulty, game_id)
+                if engine_move:
+                    engine_san = _record_move(game, engine_move)
+                    engine_reply = {
+                        'uci': engine_move.uci(),
                         'san': engine_san
-                    },
-                    'moveHistory': game['move_history']
-                })
-    
-    # Get position evaluation
-    eval_data = game_manager.analyze_position(board)
-    response['evaluation'] = eval_data
-    
-    return jsonify(response)
+                    }
+                    status = status_dict(board)
+        
+        # Build the response once, from the final position
+        response = {
+            'fen': game.fens[-1],
+            **status,
+            'lastMove': {
+                'uci': move.uci(),
+                'san': san_move
+            },
+            'moveHistory': game.move_history
+        }
+        if engine_reply:
+            response['engineMove'] = engine_reply
+        
+        # Deepen the evaluation in the background and report what is known so far
+        game_manager.schedule_analysis(board.copy(), game_id)
+        eval_data = game_manager.latest_evaluation(board)
+        if eval_data:
+            response['evaluation'] = eval_data
+        
+        return jsonify(response)
 
 @app.route('/api/hint', methods=['POST'])
 def get_hint():
-    data = request.json
-    game_id = data.get('gameId')
+    game_id = GameRequest.model_validate_json(request.get_data()).gameId
     
-    if not game_id or game_id not in active_games:
+    game = _get_game(game_id)
+    if game is None:
         return jsonify({'error': 'Invalid game ID'}), 400
     
-    game = active_games[game_id]
-    board = game['board']
+    # Search a snapshot; the game's board may move on meanwhile
+    with game.lock:
+        board = game.board.copy()
     
     # Get engine's best move
-    best_move, explanation = game_manager.get_best_move(board)
+    best_move, explanation = game_manager.get_best_move(board, 15, game_id)
     
     if best_move:
-        game['last_engine_hint'] = {
+        hint = {
             'from': chess.square_name(best_move.from_square),
             'to': chess.square_name(best_move.to_square),
             'explanation': explanation
         }
+        with game.lock:
+            game.last_engine_hint = hint
         
         return jsonify({
-            'hint': game['last_engine_hint']
+            'hint': hint
         })
     else:
         return jsonify({'error': 'Could not generate hint'}), 400
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze_position():
-    data = request.json
-    game_id = data.get('gameId')
+    game_id = GameRequest.model_validate_json(request.get_data()).gameId
     
-    if not game_id or game_id not in active_games:
+    game = _get_game(game_id)
+    if game is None:
         return jsonify({'error': 'Invalid game ID'}), 400
     
-    game = active_games[game_id]
-    board = game['board']
+    with game.lock:
+        board = game.board.copy()
     
-    eval_data = game_manager.analyze_position(board)
+    # Prefer the background analysis; only search here if it has nothing yet
+    eval_data = game_manager.latest_evaluation(board)
+    if eval_data is None:
+        eval_data = game_manager.analyze_position(board, 15, game_id)
+    elif eval_data['depth'] < BACKGROUND_DEPTH:
+        # The background search was cut short (another game or a request
+        # needed the engine); resume it so the next poll sees a deeper score
+        game_manager.schedule_analysis(board, game_id)
     
     return jsonify({
         'evaluation': eval_data
@@ -329,57 +577,43 @@ def analyze_position():
 
 @app.route('/api/undo', methods=['POST'])
 def undo_move():
-    data = request.json
-    game_id = data.get('gameId')
+    game_id = GameRequest.model_validate_json(request.get_data()).gameId
     
-    if not game_id or game_id not in active_games:
+    game = _get_game(game_id)
+    if game is None:
         return jsonify({'error': 'Invalid game ID'}), 400
     
-    game = active_games[game_id]
-    board = game['board']
-    
-    # In Play mode, undo both engine and human moves
-    if game['mode'] == 'Play':
-        # Undo engine's move first (if board has moves)
-        if len(board.move_stack) > 0:
-            board.pop()
-            if game['move_history']:
-                game['move_history'].pop()
+    with game.lock:
+        board = game.board
         
-        # Then undo player's move
-        if len(board.move_stack) > 0:
-            board.pop()
-            if game['move_history']:
-                game['move_history'].pop()
-    else:
-        # Just undo the last move in other modes
-        if len(board.move_stack) > 0:
-            board.pop()
-            if game['move_history']:
-                game['move_history'].pop()
-    
-    return jsonify({
-        'fen': board.fen(),
-        'isCheck': board.is_check(),
-        'isCheckmate': board.is_checkmate(),
-        'isStalemate': board.is_stalemate(),
-        'isGameOver': board.is_game_over(),
-        'turn': 'white' if board.turn == chess.WHITE else 'black',
-        'moveHistory': game['move_history']
-    })
+        # In Play mode, undo both engine and human moves
+        if game.mode is GameMode.PLAY:
+            # Undo engine's move first, then the player's move
+            _undo_move(game)
+            _undo_move(game)
+        else:
+            # Just undo the last move in other modes
+            _undo_move(game)
+        
+        return jsonify({
+            'fen': game.fens[-1],
+            **status_dict(board),
+            'moveHistory': game.move_history
+        })
 
 @app.route('/api/set_difficulty', methods=['POST'])
 def set_difficulty():
-    data = request.json
-    game_id = data.get('gameId')
-    difficulty = data.get('difficulty', 3)
+    data = DifficultyRequest.model_validate_json(request.get_data())
+    game_id = data.gameId
     
-    if not game_id or game_id not in active_games:
+    game = _get_game(game_id)
+    if game is None:
         return jsonify({'error': 'Invalid game ID'}), 400
     
     # Ensure difficulty is between 1-4
-    difficulty = max(1, min(4, int(difficulty)))
-    active_games[game_id]['difficulty'] = difficulty
+    difficulty = max(1, min(4, data.difficulty))
+    with game.lock:
+        game.difficulty = difficulty
     
     return jsonify({
         'success': True,
@@ -388,35 +622,28 @@ def set_difficulty():
 
 @app.route('/api/coach_comment', methods=['POST'])
 def get_coach_comment():
-    data = request.json
-    game_id = data.get('gameId')
-    move_idx = data.get('moveIdx', -1)
+    data = CoachCommentRequest.model_validate_json(request.get_data())
+    game_id = data.gameId
+    move_idx = data.moveIdx
     
-    if not game_id or game_id not in active_games:
+    game = _get_game(game_id)
+    if game is None:
         return jsonify({'error': 'Invalid game ID'}), 400
     
-    game = active_games[game_id]
-    board = chess.Board()  # Start from initial position
-    
-    # Rebuild the board up to the specified move
-    if move_idx == -1 and game['move_history']:
-        move_idx = len(game['move_history']) - 1
-    
-    if move_idx < 0 or not game['move_history'] or move_idx >= len(game['move_history']):
-        return jsonify({'error': 'Invalid move index'}), 400
-    
-    # Replay the game up to the specified move
-    for i in range(move_idx):
-        move_san = game['move_history'][i]
-        try:
-            move = board.parse_san(move_san)
-            board.push(move)
-        except ValueError:
-            continue
+    # Check and index the move lists together, so an undo can't pop in between
+    with game.lock:
+        if move_idx == -1 and game.move_history:
+            move_idx = len(game.move_history) - 1
+        
+        if move_idx < 0 or not game.move_history or move_idx >= len(game.move_history):
+            return jsonify({'error': 'Invalid move index'}), 400
+        
+        # Position just before the requested move, stored when it was played
+        fen = game.fens[move_idx]
+        uci = game.moves[move_idx]
     
-    # Get the last move and make it
-    last_move_san = game['move_history'][move_idx]
-    last_move = board.parse_san(last_move_san)
+    board = chess.Board(fen)
+    last_move = chess.Move.from_uci(uci)
     
     # Generate coaching comment
     comment = generate_coach_comment(board, last_move)
@@ -425,67 +652,10 @@ def get_coach_comment():
         'comment': comment
     })
 
-def generate_coach_comment(board, move):
-    """Generate coaching comments for a move"""
-    # Make a copy of the board to analyze the move
-    board_copy = board.copy()
-    
-    # Get piece info
-    piece = board.piece_at(move.from_square)
-    if not piece:
-        return "Unable to analyze this move."
-    
-    piece_type = piece.piece_type
-    piece_name = chess.piece_name(piece_type).capitalize()
-    
-    comments = []
-    
-    # Check if it's a capture
-    is_capture = board.is_capture(move)
-    captured_piece = board.piece_at(move.to_square)
-    
-    # Make the move on the copy to analyze position after
-    board_copy.push(move)
-    gives_check = board_copy.is_check()
-    
-    # Central control (e4, d4, e5, d5)
-    central_squares = [chess.E4, chess.D4, chess.E5, chess.D5]
-    moved_to_center = move.to_square in central_squares
-    
-    # Early development and castling
-    is_development = piece_type in [chess.KNIGHT, chess.BISHOP] and chess.square_rank(move.from_square) in [0, 7]
-    is_castling = piece_type == chess.KING and abs(move.from_square - move.to_square) == 2
-    
-    # Build comment
-    if is_capture:
-        captured_name = chess.piece_name(captured_piece.piece_type) if captured_piece else "piece"
-        comments.append(f"Good capture! Taking the {captured_name} gains material advantage.")
-    
-    if gives_check:
-        comments.append("Nice check! Putting pressure on the opponent's king.")
-    
-    if moved_to_center and piece_type in [chess.PAWN, chess.KNIGHT]:
-        comments.append("Good central control! Controlling the center is important in chess.")
-    
-    if is_development and board.fullmove_number <= 10:
-        comments.append("Good development! Getting your pieces into play early is a key principle.")
-    
-    if is_castling:
-        comments.append("Good castling! This move protects your king and connects your rooks.")
-    
-    # If no specific comments, give general advice
-    if not comments:
-        if board.fullmove_number <= 10:
-            comments.append("Remember to focus on development, central control, and king safety in the opening.")
-        elif board.fullmove_number <= 25:
-            comments.append("In the middlegame, look for tactical opportunities and strategic advantages.")
-        else:
-            comments.append("In the endgame, activate your king and try to promote your pawns.")
-    
-    return " ".join(comments)
-
-@app.teardown_appcontext
-def shutdown_engine(exception=None):
+# Close the engine when the process exits; teardown_appcontext runs after
+# every request and would quit the engine (and drop its caches) each time
+@atexit.register
+def shutdown_engine():
     game_manager.close()
 
 if __name__ == '__main__':